@@ -20,7 +20,6 @@ LONGITUDE = 13.405   # Replace with your longitude
 # =============================================================================
 # Display Settings
 # =============================================================================
-FONT_NAME = "splitflap"
 FONT_PATH = "./fonts/splitflap.bdf"
 LOGO_DIR = "airline_logos"
 
@@ -4,8 +4,8 @@ Pixoo Flight Tracker Display
 Displays real-time flight information on a Pixoo64 LED display in a
 flight-strip style layout inspired by ATC radar displays.
 
-Uses pre-buffered animation: all frames are computed upfront and sent
-to the device at once. The Pixoo loops the animation natively for
+Uses pre-buffered animation: all frames are computed and uploaded to
+the device as one animation. The Pixoo loops the animation natively for
 smooth playback without continuous network traffic.
 
 The lower half emulates an airport departure board, cycling through
@@ -21,11 +21,15 @@ Configuration:
 
 import argparse
 import os
+import queue
 import subprocess
 import sys
+import threading
+from functools import lru_cache
 from time import sleep
 
-from PIL import Image
+import numpy as np
+from PIL import Image, ImageOps
 from pizzoo import Pizzoo
 
 from config import (
@@ -33,14 +37,14 @@ from config import (
     COLOR_BOX,
     COLOR_TEXT,
     DATA_REFRESH_SECONDS,
-    FONT_NAME,
     FONT_PATH,
     LATITUDE,
     LOGO_DIR,
     LONGITUDE,
     PIXOO_IP,
 )
-from flight_data import FlightData
+from flight_data import FlightData, FlightInfo
+from pixoo_renderer import BatchedPixoo64Renderer
 
 # Aviation-style colors
 COLOR_ROUTE_LINE = "#666666"      # Dim gray for route line
@@ -48,6 +52,8 @@ COLOR_PLANE = "#FFFFFF"           # White for airplane icon
 COLOR_SEPARATOR = "#555555"       # Separator lines
 COLOR_LABEL = "#999999"           # Muted gray for info labels
 
+DISPLAY_SIZE = 64
+
 # Airplane animation constants
 PLANE_WIDTH = 5
 ROUTE_START = 21
@@ -55,85 +61,186 @@ ROUTE_END = 43
 ROUTE_WIDTH = ROUTE_END - ROUTE_START
 AIRPLANE_CYCLE = ROUTE_WIDTH + PLANE_WIDTH  # 27 frames per airplane loop
 
-# Total frames = 1 airplane cycle (27 frames). Device is unreliable above ~40 frames
-# since each frame is a separate HTTP request. Info pages: 27 / 3 = 9 frames per page.
+# Total frames = 1 airplane cycle (27 frames). Frames are streamed in batches by
+# BatchedPixoo64Renderer (device buffer holds max 60). Info pages: 27 / 3 = 9 frames per page.
 # At 400ms per frame: ~3.6s per page, ~10.8s full cycle.
 TOTAL_FRAMES = AIRPLANE_CYCLE  # 27
 
+# Departure board labels: (upper_label, lower_label) for each info page
+INFO_PAGE_LABELS = (("FLT", "ALT"), ("TYPE", "REG"), ("SPD", "HDG"))
+
+# 5x5 airplane icon pointing right: fuselage (middle row), wings (middle column)
+# and tail (short column at the back)
+AIRPLANE_ICON = np.array([
+    [0, 0, 1, 0, 0],
+    [1, 0, 1, 0, 0],
+    [1, 1, 1, 1, 1],
+    [1, 0, 1, 0, 0],
+    [0, 0, 1, 0, 0],
+], dtype=bool)
+
+
+def _build_airplane_sprites() -> list:
+    """Precompute the route-clipped airplane icon for every animation offset.
+
+    Returns one (mask, x0, x1) entry per frame of the airplane cycle, where mask
+    is the visible part of the icon and x0:x1 are its destination columns.
+    """
+    sprites = []
+    for offset in range(AIRPLANE_CYCLE):
+        x = ROUTE_START - PLANE_WIDTH + offset
+        x0, x1 = max(x, ROUTE_START), min(x + PLANE_WIDTH, ROUTE_END)
+        x1 = max(x0, x1)
+        sprites.append((AIRPLANE_ICON[:, x0 - x:x1 - x], x0, x1))
+    return sprites
+
 
+AIRPLANE_SPRITES = _build_airplane_sprites()
+
+
+@lru_cache(maxsize=256)
 def _measure_text_width(text: str) -> int:
     """Estimate text width in pixels (5px char + 1px spacing)."""
-    return max(1, len(str(text)) * 6 - 1)
+    return max(1, len(text) * 6 - 1)
 
 
+@lru_cache(maxsize=256)
 def _center_x(rect_width: int, text: str) -> int:
     """Calculate x-coordinate to center text within a given width."""
     text_width = _measure_text_width(text)
     return max(0, (rect_width - text_width) // 2)
 
 
-def _draw_airplane_icon(pizzoo: Pizzoo, x: int, y: int, clip_left: int = 0,
-                       clip_right: int = 64, color: str = COLOR_PLANE) -> None:
+def _hex_to_rgb(color: str) -> tuple:
+    """Convert a '#RRGGBB' color string to an (r, g, b) tuple."""
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def _load_glyph_atlas(path: str) -> np.ndarray:
+    """Parse a fixed-cell BDF font into a (256, cell_height, cell_width) boolean atlas.
+
+    Glyphs are placed in the font bounding box cell; characters the font doesn't
+    define render as '?'.
     """
-    Draw a small 5x5 airplane icon pointing right with clipping support.
-
-    The icon looks like:
-       #
-      ###
-     #####
-      ###
-       #
+    with open(path) as f:
+        lines = iter(f.read().splitlines())
+
+    atlas = None
+    defined = np.zeros(256, dtype=bool)
+    cell_h = cell_x = cell_y = 0
+    code = w = h = x_off = y_off = 0
+    for line in lines:
+        key, _, rest = line.partition(" ")
+        if key == "FONTBOUNDINGBOX":
+            cell_w, cell_h, cell_x, cell_y = map(int, rest.split())
+            atlas = np.zeros((256, cell_h, cell_w), dtype=bool)
+        elif key == "ENCODING":
+            code = int(rest.split()[0])
+        elif key == "BBX":
+            w, h, x_off, y_off = map(int, rest.split())
+        elif key == "BITMAP":
+            rows = [next(lines).strip() for _ in range(h)]
+            if 0 <= code < 256 and h:
+                bits = np.unpackbits(np.frombuffer(bytes.fromhex("".join(rows)), dtype=np.uint8))
+                top = cell_h + cell_y - h - y_off
+                left = x_off - cell_x
+                atlas[code, top:top + h, left:left + w] = bits.reshape(h, -1)[:, :w]
+                defined[code] = True
+
+    atlas[~defined] = atlas[ord("?")]
+    atlas.setflags(write=False)
+    return atlas
+
+
+@lru_cache(maxsize=1)
+def _get_glyphs() -> np.ndarray:
+    """Return the glyph atlas of the display font (parsed once, on first use)."""
+    return _load_glyph_atlas(FONT_PATH)
+
+
+def _new_frame() -> np.ndarray:
+    """Return a blank (black) 64x64 RGB framebuffer."""
+    return np.zeros((DISPLAY_SIZE, DISPLAY_SIZE, 3), dtype=np.uint8)
+
+
+def _paste_mask(fb: np.ndarray, mask: np.ndarray, x: int, y: int, color: str) -> None:
+    """Set every pixel where mask is True to color, with mask's top-left at (x, y)."""
+    h, w = mask.shape
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(DISPLAY_SIZE, x + w), min(DISPLAY_SIZE, y + h)
+    if x0 >= x1 or y0 >= y1:
+        return
+    fb[y0:y1, x0:x1][mask[y0 - y:y1 - y, x0 - x:x1 - x]] = _hex_to_rgb(color)
+
+
+@lru_cache(maxsize=512)
+def _render_text_np(text: str) -> np.ndarray:
+    """Rasterize text in the display font to a (read-only) boolean mask.
+
+    Cached because the same labels and values are drawn again on every rebuild.
+    The mask is color-independent; color is applied when pasting.
     """
-    # Fuselage (horizontal line) - x to x+4, y+2
-    for px in range(x, x + 5):
-        if clip_left <= px < clip_right:
-            pizzoo.draw_rectangle(xy=(px, y + 2), width=1, height=1, color=color, filled=True)
+    glyphs = _get_glyphs()
+    codes = [ord(c) if ord(c) < 256 else ord("?") for c in text]
+    cells = glyphs[codes]  # (chars, cell_height, cell_width)
+    mask = cells.transpose(1, 0, 2).reshape(cells.shape[1], -1)
+    mask.setflags(write=False)
+    return mask
+
+
+def _draw_text(fb: np.ndarray, text: str, xy: tuple, color: str) -> None:
+    """Draw text in the display font with its top-left corner at xy."""
+    text = text.strip()
+    if not text:
+        return
+    _paste_mask(fb, _render_text_np(text), xy[0], xy[1], color)
 
-    # Wings (vertical line in middle) - x+2, y to y+4
-    if clip_left <= x + 2 < clip_right:
-        pizzoo.draw_rectangle(xy=(x + 2, y), width=1, height=5, color=color, filled=True)
 
-    # Tail (small vertical at back) - x, y+1 to y+3
-    if clip_left <= x < clip_right:
-        pizzoo.draw_rectangle(xy=(x, y + 1), width=1, height=3, color=color, filled=True)
+def _draw_logo(fb: np.ndarray, logo: str) -> None:
+    """Draw the airline logo image into the logo area (y=0-19)."""
+    image = ImageOps.fit(Image.open(logo), (DISPLAY_SIZE, 20), method=Image.LANCZOS, centering=(0.5, 0.5))
+    rgba = np.asarray(image.convert("RGBA"))
+    opaque = rgba[..., 3] > 0
+    fb[0:20][opaque] = rgba[..., :3][opaque]
 
 
-def _draw_top_section(pizzoo: Pizzoo, logo: str, origin: str, destination: str,
+def _draw_top_section(fb: np.ndarray, logo: str, origin: str, destination: str,
                       airline_name: str = "", y_route: int = 20) -> None:
     """Draw the top section: airline logo and route display (y=0-33)."""
     # === AIRLINE LOGO (y=0-19) ===
     if logo:
-        pizzoo.draw_image(logo, xy=(0, 0), size=(64, 20), resample_method=Image.LANCZOS)
+        _draw_logo(fb, logo)
     elif airline_name:
         name = airline_name[:10]
-        pizzoo.draw_text(name, xy=(_center_x(64, name), 7), font=FONT_NAME, color="#FFFFFF")
+        _draw_text(fb, name, (_center_x(64, name), 7), "#FFFFFF")
 
     # === SEPARATOR after logo ===
-    _draw_separator_line(pizzoo, y=20, style="dashed")
+    _draw_separator_line(fb, y=20, style="dashed")
 
     # === ROUTE DISPLAY background (y=21-31) ===
-    pizzoo.draw_rectangle(xy=(0, 21), width=64, height=11, color=COLOR_BOX, filled=True)
+    fb[21:32, :] = _hex_to_rgb(COLOR_BOX)
 
     # Origin and destination text
-    pizzoo.draw_text(origin, xy=(2, y_route), font=FONT_NAME, color=COLOR_TEXT)
+    _draw_text(fb, origin, (2, y_route), COLOR_TEXT)
     dest_width = _measure_text_width(destination)
-    pizzoo.draw_text(destination, xy=(62 - dest_width, y_route), font=FONT_NAME, color=COLOR_TEXT)
+    _draw_text(fb, destination, (62 - dest_width, y_route), COLOR_TEXT)
 
-    # Route line (dashed)
-    for i in range(ROUTE_START, ROUTE_END, 3):
-        pizzoo.draw_rectangle(xy=(i, y_route + 6), width=2, height=1, color=COLOR_ROUTE_LINE, filled=True)
+    # Route line (dashed): 2px dashes every 3px
+    route_line = fb[y_route + 6, ROUTE_START:ROUTE_END + 1]
+    route_line[0::3] = _hex_to_rgb(COLOR_ROUTE_LINE)
+    route_line[1::3] = _hex_to_rgb(COLOR_ROUTE_LINE)
 
 
-def _draw_label_value(pizzoo: Pizzoo, label: str, value: str, y: int) -> None:
+def _draw_label_value(fb: np.ndarray, label: str, value: str, y: int) -> None:
     """Draw a label in muted gray and value in yellow, centered as a unit."""
     full_text = f"{label} {value}"
     x_start = _center_x(64, full_text)
-    pizzoo.draw_text(label, xy=(x_start, y), font=FONT_NAME, color=COLOR_LABEL)
+    _draw_text(fb, label, (x_start, y), COLOR_LABEL)
     value_x = x_start + (len(label) + 1) * 6  # label chars + space, each 6px wide
-    pizzoo.draw_text(value, xy=(value_x, y), font=FONT_NAME, color=COLOR_TEXT)
+    _draw_text(fb, value, (value_x, y), COLOR_TEXT)
 
 
-def _draw_info_page(pizzoo: Pizzoo, upper_pair: tuple, lower_pair: tuple) -> None:
+def _draw_info_page(fb: np.ndarray, upper_pair: tuple, lower_pair: tuple) -> None:
     """
     Draw a departure board info page in the lower section (y=33-63).
 
@@ -141,30 +248,33 @@ def _draw_info_page(pizzoo: Pizzoo, upper_pair: tuple, lower_pair: tuple) -> Non
     like an airport split-flap display (e.g., ("FLT", "FR2263") / ("ALT", "FL034")).
     """
     # Background
-    pizzoo.draw_rectangle(xy=(0, 33), width=64, height=31, color=COLOR_BOX, filled=True)
+    fb[33:64, :] = _hex_to_rgb(COLOR_BOX)
 
     # Separator between route and info area
-    _draw_separator_line(pizzoo, y=32, style="dashed")
+    _draw_separator_line(fb, y=32, style="dashed")
 
     # Upper row (centered)
-    _draw_label_value(pizzoo, upper_pair[0], upper_pair[1], y=34)
+    _draw_label_value(fb, upper_pair[0], upper_pair[1], y=34)
 
     # Separator between rows
-    _draw_separator_line(pizzoo, y=48, style="dashed")
+    _draw_separator_line(fb, y=48, style="dashed")
 
     # Lower row (centered)
-    _draw_label_value(pizzoo, lower_pair[0], lower_pair[1], y=50)
+    _draw_label_value(fb, lower_pair[0], lower_pair[1], y=50)
 
 
-def _draw_separator_line(pizzoo: Pizzoo, y: int, style: str = "solid") -> None:
+def _draw_separator_line(fb: np.ndarray, y: int, style: str = "solid") -> None:
     """Draw a horizontal separator line across the display."""
+    rgb = _hex_to_rgb(COLOR_SEPARATOR)
     if style == "solid":
-        pizzoo.draw_rectangle(xy=(0, y), width=64, height=1, color=COLOR_SEPARATOR, filled=True)
+        fb[y, :] = rgb
     elif style == "dashed":
-        for x in range(0, 64, 4):
-            pizzoo.draw_rectangle(xy=(x, y), width=2, height=1, color=COLOR_SEPARATOR, filled=True)
+        # 2px dashes every 4px
+        fb[y, 0::4] = rgb
+        fb[y, 1::4] = rgb
 
 
+@lru_cache(maxsize=4096)
 def _format_flight_level(altitude_ft: int) -> str:
     """Convert altitude in feet to flight level format (e.g., FL350)."""
     if altitude_ft is None or altitude_ft < 1000:
@@ -173,6 +283,7 @@ def _format_flight_level(altitude_ft: int) -> str:
     return f"FL{fl:03d}"
 
 
+@lru_cache(maxsize=4096)
 def _format_speed(speed_kts: int) -> str:
     """Format ground speed with KT suffix."""
     if speed_kts is None:
@@ -180,6 +291,7 @@ def _format_speed(speed_kts: int) -> str:
     return f"{speed_kts}KT"
 
 
+@lru_cache(maxsize=4096)
 def _format_heading(heading: int) -> str:
     """Format heading as 3-digit degrees."""
     if heading is None:
@@ -187,56 +299,109 @@ def _format_heading(heading: int) -> str:
     return f"{heading:03d}"
 
 
-def _build_and_send_animation(pizzoo: Pizzoo, data: dict) -> None:
-    """Pre-compute all animation frames and send them to the device.
+def _generate_frames(data: FlightInfo):
+    """Yield all animation frames as raw 64x64 RGB bytes.
 
     Builds TOTAL_FRAMES frames combining:
     - Smooth airplane animation (loops every AIRPLANE_CYCLE frames)
     - Departure board info cycling (one page per info item)
     """
-    logo = data.get("airline_logo_path", "")
-    airline_name = str(data.get("airline", "") or "")
-    origin = str(data.get("origin", "---"))[:3]
-    destination = str(data.get("destination", "---"))[:3]
-    flight_num = str(data.get("flight_number", "----"))[:7]
-    aircraft = str(data.get("aircraft_type_icao", "----"))[:4]
-    registration = str(data.get("registration", "------"))[:7]
-    altitude = data.get("altitude", 0) or 0
-    speed = data.get("ground_speed", 0) or 0
-    heading = data.get("heading")
+    logo = data.airline_logo_path or ""
+    airline_name = str(data.airline or "")
+    origin = str(data.origin or "---")[:3]
+    destination = str(data.destination or "---")[:3]
+    flight_num = str(data.flight_number or "----")[:7]
+    aircraft = str(data.aircraft_type_icao or "----")[:4]
+    registration = str(data.registration or "------")[:7]
+    altitude = data.altitude or 0
+    speed = data.ground_speed or 0
+    heading = data.heading
 
     # Departure board pages: ((upper_label, upper_value), (lower_label, lower_value))
     # Two rows cycling together — 3 pages shown for ~3.6s each
+    page_values = [
+        (flight_num, _format_flight_level(altitude)),
+        (aircraft, registration),
+        (_format_speed(speed), _format_heading(heading)),
+    ]
     info_pages = [
-        (("FLT", flight_num), ("ALT", _format_flight_level(altitude))),
-        (("TYPE", aircraft), ("REG", registration)),
-        (("SPD", _format_speed(speed)), ("HDG", _format_heading(heading))),
+        ((upper_label, upper_value), (lower_label, lower_value))
+        for (upper_label, lower_label), (upper_value, lower_value) in zip(INFO_PAGE_LABELS, page_values)
     ]
 
     frames_per_page = TOTAL_FRAMES // len(info_pages)
     y_route = 20
+    plane_y = y_route + 4
+    plane_rgb = _hex_to_rgb(COLOR_PLANE)
+
+    # Static content is identical across frames: render the top section once and
+    # one base frame per info page, then only stamp the moving airplane per frame.
+    top = _new_frame()
+    _draw_top_section(top, logo, origin, destination, airline_name, y_route)
+    page_bases = []
+    for upper_pair, lower_pair in info_pages:
+        base = top.copy()
+        _draw_info_page(base, upper_pair, lower_pair)
+        page_bases.append(base)
 
-    # Frame 0 is created automatically by pizzoo
     for frame_idx in range(TOTAL_FRAMES):
-        pizzoo.cls()
+        # Bottom section: departure board page for this frame
+        page_idx = min(frame_idx // frames_per_page, len(info_pages) - 1)
+        fb = page_bases[page_idx].copy()
 
-        # Top section: logo + route + animated airplane
-        _draw_top_section(pizzoo, logo, origin, destination, airline_name, y_route)
+        # Animated airplane on the route line (pre-clipped sprite lookup)
+        mask, x0, x1 = AIRPLANE_SPRITES[frame_idx % AIRPLANE_CYCLE]
+        fb[plane_y:plane_y + PLANE_WIDTH, x0:x1][mask] = plane_rgb
 
-        plane_x = ROUTE_START - PLANE_WIDTH + (frame_idx % AIRPLANE_CYCLE)
-        _draw_airplane_icon(pizzoo, plane_x, y_route + 4,
-                           clip_left=ROUTE_START, clip_right=ROUTE_END, color=COLOR_PLANE)
+        yield fb.tobytes()
+
+
+def _render_key(data: FlightInfo) -> tuple:
+    """Return a key of the displayed flight details used to skip redundant rebuilds.
+
+    Altitude is bucketed to the displayed flight level. Speed (5 KT buckets) and
+    heading (10 degree buckets) are deliberately coarser than what is shown, so
+    small differences in those are ignored and the previous values stay on screen.
+    """
+    heading = data.heading // 10 if data.heading is not None else None
+    return (
+        data.flight_number, data.aircraft_type_icao, data.registration,
+        (data.altitude or 0) // 100, (data.ground_speed or 0) // 5, heading,
+        data.origin, data.destination, data.airline_logo_path, data.airline,
+    )
 
-        # Bottom section: departure board with two info rows
-        page_idx = min(frame_idx // frames_per_page, len(info_pages) - 1)
-        upper_pair, lower_pair = info_pages[page_idx]
-        _draw_info_page(pizzoo, upper_pair, lower_pair)
 
-        if frame_idx < TOTAL_FRAMES - 1:
-            pizzoo.add_frame()
+def _build_and_send_animation(pizzoo: Pizzoo, data: FlightInfo) -> None:
+    """Build all animation frames and send them to the device.
 
+    Frames are drawn on a producer thread into a small queue while the renderer
+    uploads completed batches, so drawing overlaps with the HTTP sends.
+    """
+    frame_queue = queue.Queue(maxsize=2)
+    errors = []
+
+    def produce():
+        try:
+            for frame in _generate_frames(data):
+                frame_queue.put(frame)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            frame_queue.put(None)
+
+    producer = threading.Thread(target=produce, name="frame-producer", daemon=True)
     print(f"Sending {TOTAL_FRAMES} frames to device (frame speed: {ANIMATION_FRAME_SPEED}ms)...")
-    pizzoo.render(frame_speed=ANIMATION_FRAME_SPEED)
+    producer.start()
+    frames = iter(frame_queue.get, None)
+    try:
+        pizzoo.renderer.stream(frames, TOTAL_FRAMES, ANIMATION_FRAME_SPEED)
+    finally:
+        # Drain anything left so the producer can finish, even if sending stopped early
+        for _ in frames:
+            pass
+        producer.join()
+    if errors:
+        raise errors[0]
 
 
 def main():
@@ -251,11 +416,12 @@ def main():
             ["caffeinate", "-i", sys.executable, os.path.abspath(__file__)]
         ))
 
-    pizzoo = Pizzoo(PIXOO_IP, debug=True)
+    pizzoo = Pizzoo(PIXOO_IP, renderer=BatchedPixoo64Renderer, debug=True)
     fd = FlightData(save_logo_dir=LOGO_DIR)
-    pizzoo.load_font(FONT_NAME, FONT_PATH)
+    _get_glyphs()  # parse the BDF font once at startup
 
     current_flight_id = None
+    last_render_key = None
 
     while True:
         data = fd.get_closest_flight_data(LATITUDE, LONGITUDE)
@@ -266,17 +432,28 @@ def main():
             continue
 
         # Identify the flight by ICAO24 transponder address (unique per aircraft)
-        new_flight_id = data.get("icao24")
+        new_flight_id = data.icao24
 
         if new_flight_id == current_flight_id:
             # Same aircraft still closest — let the animation keep playing
-            print(f"Still tracking: {data.get('flight_number')} — animation unchanged")
+            print(f"Still tracking: {data.flight_number} — animation unchanged")
             sleep(DATA_REFRESH_SECONDS)
             continue
 
-        # New flight detected — rebuild and send animation
         current_flight_id = new_flight_id
-        print(f"New flight: {data.get('flight_number')} ({data.get('origin')} -> {data.get('destination')})")
+
+        render_key = _render_key(data)
+        if render_key == last_render_key:
+            # Different aircraft with matching details (small speed/heading
+            # differences ignored) — keep playing the current animation
+            print(f"New flight: {data.flight_number} — details match current display "
+                  f"(ignoring small speed/heading changes), animation unchanged")
+            sleep(DATA_REFRESH_SECONDS)
+            continue
+
+        # New flight detected — rebuild and send animation
+        last_render_key = render_key
+        print(f"New flight: {data.flight_number} ({data.origin} -> {data.destination})")
 
         _build_and_send_animation(pizzoo, data)
         print(f"Animation playing. Next check in {DATA_REFRESH_SECONDS}s...")
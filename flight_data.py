@@ -9,16 +9,99 @@ Fetches real-time flight information from FlightRadar24 API, including:
 - Destination METAR weather data
 """
 
+import hashlib
 import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from io import BytesIO
-from math import asin, cos, radians, sin, sqrt
 from pathlib import Path
 
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 from flightradar24 import FlightRadar24API
 
 from config import LOGO_BG_COLOR
 
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; the distance kernel then runs as plain NumPy
+    njit = None
+
+USER_AGENT = "PixooRadar/1.0 (+https://github.com/chrivoge/PixooRadar)"
+
+# METARs are issued roughly hourly; keep successful reports for 10 minutes
+METAR_CACHE_TTL_SECONDS = 600
+METAR_CACHE_MAX_ENTRIES = 32
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE = 111.19  # great circle distance of one degree of latitude
+
+# Bump when the logo processing pipeline changes to invalidate cached logos
+LOGO_PROCESSING_VERSION = 1
+
+# Airline codes without a logo, stored in the logo directory. Entries expire so
+# that transient 4xx responses (rate limiting, bot protection) are retried.
+NO_LOGO_FILE = ".no_logo.json"
+NO_LOGO_TTL_SECONDS = 24 * 60 * 60
+
+# Half-size of the bounding box used to pre-filter flights before ranking by distance
+NEARBY_BOX_KM = 50
+
+# Unsharp mask blur weights: 1D Gaussian with sigma 0.8 sampled at -1, 0, 1
+_BLUR_EDGE = 0.2390
+_BLUR_CENTER = 1 - 2 * _BLUR_EDGE
+
+# Shared pool for the independent per-refresh HTTP fetches (METAR, airline logo)
+_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="flight-data")
+
+
+def _haversine_batch(lat0, lon0, lats, lons):
+    """Great circle distances in kilometers from (lat0, lon0) to each (lats[i], lons[i])."""
+    lat0 = np.radians(lat0)
+    lon0 = np.radians(lon0)
+    lats = np.radians(lats)
+    lons = np.radians(lons)
+    a = np.sin((lats - lat0) / 2) ** 2 + np.cos(lat0) * np.cos(lats) * np.sin((lons - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+if njit is not None:
+    # fastmath without the no-NaN/no-Inf assumptions: unusable flights are passed as NaN
+    _haversine_batch = njit(cache=True, fastmath={"contract", "arcp", "afn", "reassoc", "nsz"})(_haversine_batch)
+
+
+@dataclass(slots=True, frozen=True)
+class FlightInfo:
+    """Details of a single tracked flight, as returned by FlightData.get_closest_flight_data."""
+
+    icao24: str | None = None
+    callsign: str | None = None
+    flight_number: str | None = None
+    registration: str | None = None
+    aircraft_type: str | None = None
+    aircraft_type_icao: str | None = None
+    airline: str | None = None
+    airline_icao: str | None = None
+    airline_iata: str | None = None
+    origin: str | None = None
+    destination: str | None = None
+    destination_icao: str | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+    altitude: int | None = None
+    ground_speed: int | None = None
+    heading: int | None = None
+    status: str | None = None
+    scheduled_departure: int | None = None
+    scheduled_arrival: int | None = None
+    estimated_arrival: int | None = None
+    destination_metar: dict | None = None
+    airline_logo_path: str | None = None
+
 
 class FlightData:
     """Fetch flight details (closest flight to a point) and attach destination METAR.
@@ -26,6 +109,8 @@ class FlightData:
     Usage:
         fd = FlightData(save_logo_dir='airline_logos')
         data = fd.get_closest_flight_data(lat, lon)
+
+    Can also be used as a context manager to close the HTTP session on exit.
     """
 
     def __init__(self, save_logo_dir: str | None = None, fr_api: FlightRadar24API | None = None):
@@ -34,60 +119,101 @@ class FlightData:
         if self.save_logo_dir:
             self.save_logo_dir.mkdir(parents=True, exist_ok=True)
 
+        # Keep-alive session for METAR requests (avoids a TCP+TLS handshake per fetch)
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+        self._session.headers.update({"User-Agent": USER_AGENT})
+
+        # ICAO -> (fetch timestamp, METAR dict), least recently used first
+        self._metar_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+        # Airlines for which FlightRadar24 returned no logo (persisted as JSON)
+        self._no_logo = self._load_no_logo()
+
+    def close(self):
+        """Close the underlying HTTP session."""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     @staticmethod
     def haversine(lat1, lon1, lat2, lon2):
-        """Calculate the great circle distance in kilometers between two points."""
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-        a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-        c = 2 * asin(sqrt(a))
-        r = 6371
-        return c * r
+        """Calculate the great circle distance in kilometers between two points.
+
+        lat2/lon2 may be scalars or NumPy arrays; thin wrapper around _haversine_batch.
+        """
+        lats = np.atleast_1d(np.asarray(lat2, dtype=np.float64))
+        lons = np.atleast_1d(np.asarray(lon2, dtype=np.float64))
+        dists = _haversine_batch(float(lat1), float(lon1), lats, lons)
+        return dists if np.ndim(lat2) else float(dists[0])
+
+    @staticmethod
+    def _position(flight):
+        """Return (lat, lon) for a flight, or (nan, nan) if it has no usable position."""
+        try:
+            return float(flight.latitude), float(flight.longitude)
+        except (AttributeError, TypeError, ValueError):
+            return np.nan, np.nan
 
     def _find_closest(self, lat, lon):
         bounds = self.fr_api.get_bounds_by_point(lat, lon, 100000)
         flights = self.fr_api.get_flights(bounds=bounds)
+
+        # Only consider flights with a non-null 'airline' field
+        flights = [flight for flight in flights or () if getattr(flight, "airline_iata", None)]
         if not flights:
             return None, None
 
-        closest_flight = None
-        min_dist = float("inf")
-        details = None
-        for flight in flights:
-            # Skip flights without airline information (only consider flights with a non-null 'airline' field)
-            if not getattr(flight, "airline_iata", None):
-                continue
-
-            try:
-                dist = self.haversine(lat, lon, flight.latitude, flight.longitude)
-            except Exception:
-                continue
-            if dist < min_dist:
-                min_dist = dist
-                closest_flight = flight
-                try:
-                    details = self.fr_api.get_flight_details(closest_flight)
-                except Exception:
-                    details = None
+        # Flight positions as arrays; unusable flights are NaN
+        positions = np.array([self._position(flight) for flight in flights], dtype=np.float64)
+        lats, lons = positions[:, 0], positions[:, 1]
+
+        # Cheap bounding-box reject before the trig-heavy distance pass. Anything
+        # outside the box is more than NEARBY_BOX_KM away, so if a flight inside
+        # it is within that distance, it is the closest overall.
+        half_lat = NEARBY_BOX_KM / KM_PER_DEGREE
+        half_lon = half_lat / max(np.cos(np.radians(min(abs(lat) + half_lat, 89.0))), 0.01)
+        # Longitude difference wrapped into [-180, 180) so the box spans the antimeridian
+        dlon = np.abs((lons - lon + 180.0) % 360.0 - 180.0)
+        nearby = np.flatnonzero((np.abs(lats - lat) < half_lat) & (dlon < half_lon))
+        closest_idx = None
+        if nearby.size:
+            dists = _haversine_batch(float(lat), float(lon), lats[nearby], lons[nearby])
+            best = int(np.argmin(dists))
+            if dists[best] <= NEARBY_BOX_KM:
+                closest_idx = int(nearby[best])
+
+        if closest_idx is None:
+            # Nothing close by: rank all flights
+            dists = _haversine_batch(float(lat), float(lon), lats, lons)
+            if np.isnan(dists).all():
+                return None, None
+            closest_idx = int(np.nanargmin(dists))
+
+        closest_flight = flights[closest_idx]
+        try:
+            details = self.fr_api.get_flight_details(closest_flight)
+        except Exception:
+            details = None
         return closest_flight, details
 
-    @staticmethod
-    def _safe_get(d, *keys):
-        v = d
-        for k in keys:
-            if not isinstance(v, dict):
-                return None
-            v = v.get(k)
-        return v
-
     def _fetch_metar(self, icao):
         if not icao:
             return None
         icao = str(icao).strip().upper()
+
+        cached = self._metar_cache.get(icao)
+        if cached and time.time() - cached[0] < METAR_CACHE_TTL_SECONDS:
+            self._metar_cache.move_to_end(icao)
+            return cached[1]
+
         url = f"https://tgftp.nws.noaa.gov/data/observations/metar/stations/{icao}.TXT"
         try:
-            resp = requests.get(url, timeout=5)
+            resp = self._session.get(url, timeout=5)
             if resp.status_code != 200:
                 return None
             lines = resp.text.strip().splitlines()
@@ -99,10 +225,48 @@ class FlightData:
             else:
                 timestamp = None
                 raw = lines[0].strip()
-            return {"raw": raw, "timestamp": timestamp, "source": url}
+            result = {"raw": raw, "timestamp": timestamp, "source": url}
+            self._metar_cache[icao] = (time.time(), result)
+            self._metar_cache.move_to_end(icao)
+            if len(self._metar_cache) > METAR_CACHE_MAX_ENTRIES:
+                self._metar_cache.popitem(last=False)
+            return result
         except Exception:
             return None
 
+    @staticmethod
+    def _enhance_pixels(pixels: np.ndarray, autocontrast: bool = True, sharpen: bool = True,
+                        percent: int = 150, threshold: int = 2) -> np.ndarray:
+        """Autocontrast and unsharp-mask the color channels of an RGB(A) array in one pass.
+
+        Equivalent to ImageOps.autocontrast(cutoff=0) followed by a radius ~0.8
+        UnsharpMask, but without materializing an intermediate PIL image. Alpha is kept.
+        Like ImageOps.autocontrast, which rejects RGBA images, contrast is only
+        stretched for images without an alpha channel.
+        """
+        rgb = pixels[..., :3].astype(np.float32)
+
+        if autocontrast and pixels.shape[-1] == 3:
+            # Stretch each channel's [min, max] range to [0, 255]
+            lo = rgb.min(axis=(0, 1))
+            hi = rgb.max(axis=(0, 1))
+            span = hi - lo
+            stretch = span > 0
+            scale = np.where(stretch, 255.0 / np.where(stretch, span, 1), 1.0)
+            rgb = np.where(stretch, np.floor((rgb - lo) * scale), rgb)
+
+        if sharpen:
+            # Separable 3x3 Gaussian (sigma 0.8) blur with edge padding
+            padded = np.pad(rgb, ((1, 1), (1, 1), (0, 0)), mode="edge")
+            blurred = _BLUR_EDGE * (padded[:-2] + padded[2:]) + _BLUR_CENTER * padded[1:-1]
+            blurred = _BLUR_EDGE * (blurred[:, :-2] + blurred[:, 2:]) + _BLUR_CENTER * blurred[:, 1:-1]
+            detail = rgb - blurred
+            rgb = np.where(np.abs(detail) >= threshold, rgb + detail * (percent / 100), rgb)
+
+        out = pixels.copy()
+        out[..., :3] = np.clip(np.rint(rgb), 0, 255).astype(np.uint8)
+        return out
+
     def _resize_logo_bytes(self, logo_bytes: bytes, target_w: int = 64, target_h: int = 20,
                            bg=(255, 255, 255, 0), sharpen: bool = True, autocontrast: bool = True,
                            flatten_bg: bool = True):
@@ -116,13 +280,17 @@ class FlightData:
         Returns a tuple (resized_bytes, ext) where ext is 'png' when successful. On failure returns (original_bytes, None).
         """
         try:
-            from PIL import Image, ImageOps, ImageFilter
+            from PIL import Image
         except Exception:
             # Pillow not available; return original
             return logo_bytes, None
 
         try:
-            src = Image.open(BytesIO(logo_bytes)).convert("RGBA")
+            src = Image.open(BytesIO(logo_bytes))
+            # Decode now so the source buffer can be released before resizing
+            src.load()
+            if src.mode != "RGBA":
+                src = src.convert("RGBA")
         except Exception:
             return logo_bytes, None
 
@@ -152,15 +320,10 @@ class FlightData:
             except Exception:
                 return logo_bytes, None
 
-        if autocontrast:
-            try:
-                resized = ImageOps.autocontrast(resized, cutoff=0)
-            except Exception:
-                pass
-
-        if sharpen:
+        if autocontrast or sharpen:
             try:
-                resized = resized.filter(ImageFilter.UnsharpMask(radius=0.8, percent=150, threshold=2))
+                enhanced = self._enhance_pixels(np.asarray(resized), autocontrast=autocontrast, sharpen=sharpen)
+                resized = Image.fromarray(enhanced)
             except Exception:
                 pass
 
@@ -180,11 +343,115 @@ class FlightData:
         except Exception:
             return logo_bytes, None
 
+    def _process_logo(self, logo_bytes: bytes) -> bytes:
+        """Return the 64x20 display version of downloaded logo bytes.
+
+        Processed logos are kept in ``{save_logo_dir}/.cache/`` keyed by a hash of the
+        source bytes and the processing settings, so an identical download is never
+        resized twice while a changed config or pipeline still misses the cache.
+        """
+        settings = dict(target_w=64, target_h=20, bg=LOGO_BG_COLOR, sharpen=True, autocontrast=True,
+                        flatten_bg=True)
+        key = repr((LOGO_PROCESSING_VERSION, sorted(settings.items()))).encode()
+        digest = hashlib.blake2b(logo_bytes + key, digest_size=8).hexdigest()
+        cache_path = self.save_logo_dir / ".cache" / f"{digest}.png"
+        if cache_path.exists():
+            return cache_path.read_bytes()
+
+        # Attempt to resize the logo to a 64x20 graphic for the display
+        try:
+            resized_bytes, resized_ext = self._resize_logo_bytes(logo_bytes, **settings)
+        except Exception:
+            return logo_bytes
+        if not (resized_bytes and resized_ext):
+            return logo_bytes
+
+        try:
+            cache_path.parent.mkdir(exist_ok=True)
+            cache_path.write_bytes(resized_bytes)
+        except OSError:
+            pass
+        return resized_bytes
+
+    def _load_no_logo(self) -> dict[str, float]:
+        """Load airline codes known to have no logo, mapped to when that was recorded."""
+        if not self.save_logo_dir:
+            return {}
+        try:
+            with open(self.save_logo_dir / NO_LOGO_FILE) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(entries, dict):
+            # Old format without timestamps: start over so those airlines are retried
+            return {}
+        now = time.time()
+        return {code: ts for code, ts in entries.items()
+                if isinstance(ts, (int, float)) and now - ts < NO_LOGO_TTL_SECONDS}
+
+    def _has_no_logo(self, code: str) -> bool:
+        """Return True if the airline recently had no logo (entry not yet expired)."""
+        ts = self._no_logo.get(code)
+        return ts is not None and time.time() - ts < NO_LOGO_TTL_SECONDS
+
+    def _mark_no_logo(self, code: str) -> None:
+        """Remember that an airline has no logo so it isn't requested again until the entry expires."""
+        now = time.time()
+        self._no_logo = {c: ts for c, ts in self._no_logo.items() if now - ts < NO_LOGO_TTL_SECONDS}
+        self._no_logo[code] = now
+        try:
+            with open(self.save_logo_dir / NO_LOGO_FILE, "w") as f:
+                json.dump(self._no_logo, f, sort_keys=True)
+        except OSError:
+            pass
+
+    def _get_logo_path(self, airline_iata, airline_icao):
+        """Return the path of the saved PNG logo for an airline, downloading it if needed.
+
+        Returns None when no logo could be fetched or saved.
+        """
+        try:
+            # Build a safe base filename from IATA/ICAO and check if a PNG logo already exists.
+            file_base = airline_iata or airline_icao or "airline_logo"
+            safe_base = "".join(c for c in file_base if c.isalnum() or c in ("-", "_")).strip() or "airline_logo"
+
+            if self.save_logo_dir:
+                p = self.save_logo_dir / f"{safe_base}.png"
+                if p.exists():
+                    # PNG logo already present, don't download
+                    return str(p)
+                if self._has_no_logo(safe_base):
+                    # Recently returned no logo, don't ask again yet
+                    return None
+
+            # not present -> download and save (assume PNG)
+            logo_result = self.fr_api.get_airline_logo(iata=airline_iata, icao=airline_icao)
+            logo_bytes = None
+            if isinstance(logo_result, tuple) and len(logo_result) >= 1:
+                logo_bytes = logo_result[0]
+            else:
+                logo_bytes = logo_result
+
+            if logo_bytes and self.save_logo_dir:
+                logo_bytes_to_save = self._process_logo(logo_bytes)
+
+                file_name = f"{safe_base}.png"
+                file_path = str(self.save_logo_dir / file_name)
+                with open(file_path, "wb") as f:
+                    f.write(logo_bytes_to_save)
+                return file_path
+            if not logo_bytes and self.save_logo_dir:
+                self._mark_no_logo(safe_base)
+        except Exception:
+            # don't fail the whole lookup if logo fetch/save fails
+            pass
+        return None
+
     def get_closest_flight_data(self, lat, lon, save_logo: bool = True):
-        """Return a dict with flight details for the closest flight to (lat, lon).
+        """Return a FlightInfo for the closest flight to (lat, lon), or None.
 
-        The returned dict contains the same keys as the previous script plus
-        'destination_icao' and 'destination_metar'. This method does not print.
+        Includes the destination METAR and, if save_logo is set, the path of the
+        saved airline logo. This method does not print.
         """
         closest_flight, details = self._find_closest(lat, lon)
         if not closest_flight:
@@ -192,95 +459,74 @@ class FlightData:
 
         details = details or {}
 
+        # Destructure the nested details once instead of re-walking them per field
+        ident = details.get("identification") or {}
+        aircraft = details.get("aircraft") or {}
+        model = aircraft.get("model") or {}
+        airline = details.get("airline") or {}
+        airline_code = airline.get("code") or {}
+        airport = details.get("airport") or {}
+        origin_code = (airport.get("origin") or {}).get("code") or {}
+        destination_code = (airport.get("destination") or {}).get("code") or {}
+        times = details.get("time") or {}
+        scheduled = times.get("scheduled") or {}
+        estimated = times.get("estimated") or {}
+
         # If trail is present, use the most recent point as fallback for lat/lng
         trail_point = None
         if isinstance(details.get("trail"), list) and details["trail"]:
             trail_point = details["trail"][0] or details["trail"][-1]
 
-        flight_data = {
-            "icao24": getattr(closest_flight, "icao", None) or self._safe_get(details, "identification", "id"),
-            "callsign": self._safe_get(details, "identification", "callsign") or getattr(closest_flight, "callsign", None),
-            "flight_number": self._safe_get(details, "identification", "number", "default"),
-            "registration": self._safe_get(details, "aircraft", "registration") or getattr(closest_flight, "registration", None),
-            "aircraft_type": self._safe_get(details, "aircraft", "model", "text"),
-            "aircraft_type_icao": self._safe_get(details, "aircraft", "model", "code"),
-            "airline": self._safe_get(details, "airline", "name"),
-            "airline_icao": self._safe_get(details, "airline", "code", "icao"),
-            "airline_iata": self._safe_get(details, "airline", "code", "iata"),
-            "origin": self._safe_get(details, "airport", "origin", "code", "iata"),
-            "destination": self._safe_get(details, "airport", "destination", "code", "iata"),
-            "destination_icao": self._safe_get(details, "airport", "destination", "code", "icao"),
-            "latitude": getattr(closest_flight, "latitude", None) or (trail_point and trail_point.get("lat")),
-            "longitude": getattr(closest_flight, "longitude", None) or (trail_point and trail_point.get("lng")),
-            "altitude": getattr(closest_flight, "altitude", None),
-            "ground_speed": getattr(closest_flight, "ground_speed", None),
-            "heading": getattr(closest_flight, "heading", None),
-            "status": self._safe_get(details, "status", "text"),
-            "scheduled_departure": self._safe_get(details, "time", "scheduled", "departure"),
-            "scheduled_arrival": self._safe_get(details, "time", "scheduled", "arrival"),
-            "estimated_arrival": self._safe_get(details, "time", "estimated", "arrival"),
-        }
-
-        # Attach latest METAR for destination (if available)
-        try:
-            flight_data["destination_metar"] = self._fetch_metar(flight_data.get("destination_icao"))
-        except Exception:
-            flight_data["destination_metar"] = None
+        airline_iata = airline_code.get("iata")
+        airline_icao = airline_code.get("icao")
+        destination_icao = destination_code.get("icao")
 
-        # Optionally fetch and save airline logo
+        # METAR and logo downloads are independent: run them concurrently
+        metar_future = _executor.submit(self._fetch_metar, destination_icao)
+        logo_future = None
         if save_logo:
-            try:
-                # Build a safe base filename from IATA/ICAO and check if a PNG logo already exists.
-                file_base = flight_data.get("airline_iata") or flight_data.get("airline_icao") or "airline_logo"
-                safe_base = "".join(c for c in file_base if c.isalnum() or c in ("-", "_")).strip() or "airline_logo"
-
-                existing_path = None
-                if self.save_logo_dir:
-                    p = self.save_logo_dir / f"{safe_base}.png"
-                    if p.exists():
-                        existing_path = p
-
-                if existing_path:
-                    # PNG logo already present, don't download
-                    flight_data["airline_logo_path"] = str(existing_path)
-                else:
-                    # not present -> download and save (assume PNG)
-                    logo_result = self.fr_api.get_airline_logo(iata=flight_data.get("airline_iata"), icao=flight_data.get("airline_icao"))
-                    logo_bytes = None
-                    if isinstance(logo_result, tuple) and len(logo_result) >= 1:
-                        logo_bytes = logo_result[0]
-                    else:
-                        logo_bytes = logo_result
-
-                    if logo_bytes and self.save_logo_dir:
-                        # Attempt to resize the logo to a 64x20 graphic for the display
-                        try:
-                            resized_bytes, resized_ext = self._resize_logo_bytes(logo_bytes, target_w=64, target_h=20,
-                                                                                  bg=LOGO_BG_COLOR, sharpen=True, autocontrast=True,
-                                                                                  flatten_bg=True)
-                            if resized_bytes and resized_ext:
-                                logo_bytes_to_save = resized_bytes
-                            else:
-                                logo_bytes_to_save = logo_bytes
-                        except Exception:
-                            logo_bytes_to_save = logo_bytes
-
-                        file_name = f"{safe_base}.png"
-                        file_path = str(self.save_logo_dir / file_name)
-                        with open(file_path, "wb") as f:
-                            f.write(logo_bytes_to_save)
-                        flight_data["airline_logo_path"] = file_path
-            except Exception:
-                # don't fail the whole method if logo fetch/save fails
-                pass
+            logo_future = _executor.submit(self._get_logo_path, airline_iata, airline_icao)
 
-        return flight_data
+        # Latest METAR for destination (if available)
+        try:
+            metar = metar_future.result()
+        except Exception:
+            metar = None
+
+        # Optionally the saved airline logo
+        logo_path = logo_future.result() if logo_future else None
+
+        return FlightInfo(
+            icao24=getattr(closest_flight, "icao", None) or ident.get("id"),
+            callsign=ident.get("callsign") or getattr(closest_flight, "callsign", None),
+            flight_number=(ident.get("number") or {}).get("default"),
+            registration=aircraft.get("registration") or getattr(closest_flight, "registration", None),
+            aircraft_type=model.get("text"),
+            aircraft_type_icao=model.get("code"),
+            airline=airline.get("name"),
+            airline_icao=airline_icao,
+            airline_iata=airline_iata,
+            origin=origin_code.get("iata"),
+            destination=destination_code.get("iata"),
+            destination_icao=destination_icao,
+            latitude=getattr(closest_flight, "latitude", None) or (trail_point and trail_point.get("lat")),
+            longitude=getattr(closest_flight, "longitude", None) or (trail_point and trail_point.get("lng")),
+            altitude=getattr(closest_flight, "altitude", None),
+            ground_speed=getattr(closest_flight, "ground_speed", None),
+            heading=getattr(closest_flight, "heading", None),
+            status=(details.get("status") or {}).get("text"),
+            scheduled_departure=scheduled.get("departure"),
+            scheduled_arrival=scheduled.get("arrival"),
+            estimated_arrival=estimated.get("arrival"),
+            destination_metar=metar,
+            airline_logo_path=logo_path,
+        )
 
 
 if __name__ == "__main__":
     # Example usage — uses coordinates from config.py
     from config import LATITUDE, LONGITUDE, LOGO_DIR
 
-    fd = FlightData(save_logo_dir=LOGO_DIR)
-    data = fd.get_closest_flight_data(LATITUDE, LONGITUDE)
-    print(json.dumps(data, indent=4))
\ No newline at end of file
+    with FlightData(save_logo_dir=LOGO_DIR) as fd:
+        data = fd.get_closest_flight_data(LATITUDE, LONGITUDE)
+    print(json.dumps(asdict(data) if data else None, indent=4))
\ No newline at end of file
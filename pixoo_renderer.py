@@ -0,0 +1,115 @@
+"""
+Pixoo Renderer Module
+
+Batched renderer for the Pixoo64, used in place of pizzoo's default renderer.
+
+pizzoo's stock Pixoo64Renderer uploads every animation frame with its own
+``Draw/SendHttpGif`` POST (and a fresh TCP connection each time). This renderer
+wraps several ``Draw/SendHttpGif`` commands into a single ``Draw/CommandList``
+request and reuses one keep-alive ``requests.Session`` for the device.
+"""
+
+from base64 import b64encode
+from json import dumps
+from math import floor
+
+import requests
+from pizzoo._renderers import Renderer
+
+# Frames packed into one Draw/CommandList request. Each 64x64 frame is ~16KB of
+# base64, so this keeps individual requests well within what the device accepts.
+FRAMES_PER_REQUEST = 9
+
+
+class BatchedPixoo64Renderer(Renderer):
+    """Pixoo64 renderer that uploads animation frames in batches.
+
+    Usage:
+        pizzoo = Pizzoo(PIXOO_IP, renderer=BatchedPixoo64Renderer)
+    """
+
+    _max_frame_speed = 10000
+    _min_frame_speed = 10
+
+    def __init__(self, address, pizzoo, debug, frames_per_request: int = FRAMES_PER_REQUEST):
+        super().__init__(address, pizzoo, debug)
+        self._size = 64
+        self._max_frames = 60
+        self._id_limit = 100
+        self._frames_per_request = max(1, frames_per_request)
+        self._url = f"http://{address}/post"
+        self._session = requests.Session()
+        self._pic_id = self._request("Draw/GetHttpGifId")["PicId"]
+        if self._pic_id > self._id_limit:
+            self._reset_pic_id()
+
+    def _post(self, payload: dict) -> dict:
+        result = self._session.post(self._url, dumps(payload), timeout=10).json()
+        if result.get("error_code", 0) != 0:
+            raise Exception(f"Error on request {payload['Command']} with code \"{result['error_code']}\"")
+        return result
+
+    def _request(self, endpoint: str, data: dict | None = None) -> dict:
+        return self._post({"Command": endpoint, **(data or {})})
+
+    def _reset_pic_id(self) -> None:
+        try:
+            self._request("Draw/ResetHttpGifId")
+            self._pic_id = 1
+        except Exception as e:
+            if self._debug:
+                print(e)
+
+    def _frame_command(self, frame_data, speed: int, frame_count: int, offset: int) -> dict:
+        return {
+            "Command": "Draw/SendHttpGif",
+            "PicNum": frame_count,
+            "PicWidth": self._size,
+            "PicOffset": offset,
+            "PicID": self._pic_id,
+            "PicSpeed": speed,
+            "PicData": b64encode(bytes(bytearray(frame_data))).decode(),
+        }
+
+    def switch(self, on=True):
+        self._request("Channel/OnOffScreen", {"OnOff": 1 if on else 0})
+
+    def set_brightness(self, brightness):
+        self._request("Channel/SetBrightness", {"Brightness": max(0, min(100, brightness))})
+
+    def render(self, buffer, frame_speed):
+        """Send the animation buffer using as few HTTP requests as possible."""
+        buffer = buffer[-self._max_frames:]
+        self.stream(buffer, len(buffer), frame_speed)
+
+    def stream(self, frames, frame_count: int, frame_speed):
+        """Send frames as they become available, one Draw/CommandList per full batch.
+
+        frames may be any iterable of frame buffers (e.g. fed by a producer thread);
+        frame_count is the number of frames it yields (at most 60 are sent). If it
+        yields fewer, the final partial batch is not sent.
+        """
+        self._pic_id += 1
+        if self._pic_id >= self._id_limit:
+            self._reset_pic_id()
+        frame_count = min(frame_count, self._max_frames)
+        frame_speed = floor(max(self._min_frame_speed, min(self._max_frame_speed, frame_speed)))
+
+        batch = []
+        received = 0
+        for offset, frame in enumerate(frames):
+            if offset >= frame_count:
+                break
+            batch.append(self._frame_command(frame, frame_speed, frame_count, offset))
+            received = offset + 1
+            if len(batch) == self._frames_per_request:
+                self._post({"Command": "Draw/CommandList", "CommandList": batch})
+                batch = []
+        # Only flush the last batch if every frame arrived; if the producer stopped
+        # early, don't complete an animation that is missing frames
+        if batch and received == frame_count:
+            self._post({"Command": "Draw/CommandList", "CommandList": batch})
+
+    def close(self) -> None:
+        """Close the underlying HTTP session."""
+        self._session.close()